@@ -1,11 +1,16 @@
-from flask import Flask, render_template, send_file
+from flask import Flask, render_template, send_file, request
 import requests
 import xml.etree.ElementTree as ET
 import pandas as pd
+import numpy as np
 from io import BytesIO
 from datetime import datetime, timedelta, timezone
 import threading
 import time
+import locale
+import json
+import os
+import queue
 
 # UTC+2 timezone
 UTC_PLUS_2 = timezone(timedelta(hours=2))
@@ -21,10 +26,65 @@ def utility_processor():
 cache = {
     'data': None,
     'timestamp': None,
-    'lock': threading.Lock()
+    'snapshot': None,
+    'records': None,
+    'sort_indexes': None,
+    'lock': threading.Lock(),  # Guards reading and swapping the entries above
+    'refresh_lock': threading.Lock()  # Held while fetching and rebuilding, so only one refresh runs at a time
 }
 CACHE_DURATION = timedelta(minutes=5)  # Cache expires after 5 minutes
 
+# Products with these words in the description are left out of the All Products tab
+EXCLUDED_WORDS = ['Delivery', 'Voluto', 'Nativa', 'Miscellaneous']
+
+# Tabs: tab key -> (sheet name, export filename prefix)
+TABS = {
+    'japi': ('Japi Planters', 'japi_planters'),
+    'driptrays': ('Driptrays', 'driptrays'),
+    'dropin': ('Drop-in Pots', 'dropin_pots'),
+    'waterfeatures': ('Water Features', 'water_features'),
+    'nbfx': ('Organic Feature Pots', 'organic_feature_pots'),
+    'plasticmats': ('Plastic Woven Mats', 'plastic_woven_mats'),
+    'allproducts': ('All Products', 'all_products'),
+}
+
+# Sort orders selectable with the ?sort= query parameter: sort key -> label
+SORT_ORDERS = {
+    'description': 'Description (A-Z)',
+    '-description': 'Description (Z-A)',
+    'code': 'Supplier Code (A-Z)',
+    '-code': 'Supplier Code (Z-A)',
+    'onhand': 'Onhand (Lowest First)',
+    '-onhand': 'Onhand (Highest First)',
+}
+DEFAULT_SORT = 'description'
+
+# Locale used to collate descriptions and supplier codes when sorting (COLLATION_LOCALE
+# environment variable). It is applied to LC_COLLATE for the whole process on the first
+# refresh; "C" sorts by case-insensitive code point.
+COLLATION_LOCALE = os.environ.get('COLLATION_LOCALE', 'en_ZA.UTF-8')
+collation_state = {'configured': False}
+
+# Snapshot export formats: format -> (file extension, mimetype)
+SNAPSHOT_EXPORT_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+    'csv': ('csv.gz', 'application/gzip'),
+}
+
+# Low-stock alerts: thresholds config (alerts are disabled if the file doesn't exist)
+ALERT_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stock_thresholds.json')
+
+# Alert state, updated on every cache refresh
+alert_state = {
+    'config': None,
+    'config_mtime': None,
+    'onhand': {},  # Supplier code -> on-hand quantity from the previous refresh
+    'levels': {},  # Supplier code -> 'low' or 'negative' for SKUs currently alerting
+    'queue': queue.Queue(),  # (events, config) batches waiting for the sender thread
+    'sender': None
+}
+
 # API Configuration from Postman collection
 API_URL = "http://192.168.5.90:8090/IQRetailRestAPI/v1/IQ_API_Request_Stock_Attributes?callformat=xml"
 API_HEADERS = {
@@ -268,19 +328,496 @@ def calculate_water_feature_onhand(water_feature_code, all_products_dict):
     return min(available_quantities) if available_quantities else 0
 
 
+def parse_onhand(onhand_value):
+    """Parse an on-hand quantity from the API into an integer (0 if not numeric)"""
+    try:
+        return int(float(str(onhand_value).strip() or '0'))
+    except (ValueError, TypeError):
+        return 0
+
+
+def is_numeric_onhand(onhand_value):
+    """Return True if parse_onhand can read the value (blank counts as 0)"""
+    try:
+        int(float(str(onhand_value).strip() or '0'))
+        return True
+    except (ValueError, TypeError, OverflowError):
+        return False
+
+
+def get_product_category(supplier_code, description):
+    """Return the tab key for a product, or None if it belongs to no category tab.
+
+    Args:
+        supplier_code: Upper-cased, stripped supplier item code
+        description: Upper-cased, stripped description
+    """
+    # Priority 1: Water Features (Supplier_Item_Code starts with "W")
+    if supplier_code.startswith('W'):
+        return 'waterfeatures'
+    # Priority 2: Organic Feature Pots (Supplier_Item_Code starts with "NBP", "FX", "NR", or "RV", or Description contains "Organic Fiberglass")
+    if supplier_code.startswith(('NBP', 'FX', 'NR', 'RV')) or 'ORGANIC FIBERGLASS' in description:
+        return 'nbfx'
+    # Priority 3: Driptrays (Supplier_Item_Code contains "JPRD" or "JPQD")
+    if 'JPRD' in supplier_code or 'JPQD' in supplier_code:
+        return 'driptrays'
+    # Priority 4: Drop-in Pots (Description contains "Styler" or "Shrub")
+    if 'STYLER' in description or 'SHRUB' in description:
+        return 'dropin'
+    # Priority 5: Japi Planters (Supplier_Item_Code starts with "J" or "NSGB2")
+    if supplier_code.startswith(('J', 'NSGB2')):
+        return 'japi'
+    # Priority 6: Plastic Woven Mats (Supplier_Item_Code starts with "PWM")
+    if supplier_code.startswith('PWM'):
+        return 'plasticmats'
+    return None
+
+
+def get_listed_products(products):
+    """Return the products shown on the pages (those with a supplier item code)"""
+    return [p for p in products if (p.get('Supplier_Item_Code') or '').strip()]
+
+
+def build_stock_snapshot(products):
+    """Build a columnar snapshot (DataFrame) of the raw API products.
+
+    Columns:
+        Description, Supplier_Item_Code: As returned by the API
+        Category: Tab key from get_product_category (empty if none)
+        Onhand_Available: Raw on-hand quantity from the API
+        Is_Kit: True for water features, whose availability comes from their components
+        Kit_Onhand_Available: Kit availability from calculate_water_feature_onhand (null if not a kit)
+        Onhand_Effective: The quantity shown on the pages (kit availability for kits)
+        Onhand_Numeric: False if the API's on-hand value (or a kit component's) isn't a number
+        In_All_Products: Whether the product is listed on the All Products tab
+    """
+    # Mapping of supplier codes to raw on-hand quantities for the kit calculations
+    products_dict = {}
+    for product in products:
+        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
+        if supplier_code:
+            products_dict[supplier_code] = product.get('Onhand_Available', '0')
+
+    columns = {
+        'Description': [],
+        'Supplier_Item_Code': [],
+        'Category': [],
+        'Onhand_Available': [],
+        'Is_Kit': [],
+        'Kit_Onhand_Available': [],
+        'Onhand_Effective': [],
+        'Onhand_Numeric': [],
+        'In_All_Products': [],
+    }
+    excluded_words = [word.lower() for word in EXCLUDED_WORDS]
+
+    for product in get_listed_products(products):
+        supplier_code = (product.get('Supplier_Item_Code') or '').strip()
+        description = (product.get('Description') or '').strip()
+        code_upper = supplier_code.upper()
+        category = get_product_category(code_upper, description.upper())
+        onhand = parse_onhand(product.get('Onhand_Available'))
+        is_kit = category == 'waterfeatures'
+        kit_onhand = calculate_water_feature_onhand(code_upper, products_dict) if is_kit else None
+        if is_kit:
+            components = get_water_feature_components().get(code_upper) or []
+            numeric = all(is_numeric_onhand(products_dict.get(component_code, '0')) for component_code, _ in components)
+        else:
+            numeric = is_numeric_onhand(product.get('Onhand_Available'))
+
+        columns['Description'].append(product.get('Description') or '')
+        columns['Supplier_Item_Code'].append(product.get('Supplier_Item_Code') or '')
+        columns['Category'].append(category or '')
+        columns['Onhand_Available'].append(onhand)
+        columns['Is_Kit'].append(is_kit)
+        columns['Kit_Onhand_Available'].append(kit_onhand)
+        columns['Onhand_Effective'].append(kit_onhand if is_kit else onhand)
+        columns['Onhand_Numeric'].append(numeric)
+        columns['In_All_Products'].append(not any(word in description.lower() for word in excluded_words))
+
+    df = pd.DataFrame(columns)
+    df['Category'] = df['Category'].astype('category')
+    df['Onhand_Available'] = df['Onhand_Available'].astype('int64')
+    df['Kit_Onhand_Available'] = df['Kit_Onhand_Available'].astype('Int64')
+    df['Onhand_Effective'] = df['Onhand_Effective'].astype('int64')
+    return df
+
+
+def build_snapshot_records(products, snapshot):
+    """Build the per-row product dicts rendered by the pages and the Excel export.
+
+    Row i matches row i of the snapshot. Kits get their calculated on-hand quantity,
+    other products keep the on-hand value exactly as returned by the API.
+    """
+    records = []
+    for product, kit_onhand in zip(get_listed_products(products), snapshot['Kit_Onhand_Available']):
+        records.append({
+            'Description': product.get('Description') or '',
+            'Supplier_Item_Code': product.get('Supplier_Item_Code') or '',
+            'Onhand_Available': product.get('Onhand_Available', '') if pd.isna(kit_onhand) else str(kit_onhand)
+        })
+    return records
+
+
+def configure_collation():
+    """Apply COLLATION_LOCALE to LC_COLLATE once, logging if it can't be applied"""
+    if collation_state['configured']:
+        return
+    collation_state['configured'] = True
+    try:
+        locale.setlocale(locale.LC_COLLATE, COLLATION_LOCALE)
+        print(f"Sorting with collation locale {locale.setlocale(locale.LC_COLLATE)}")
+    except locale.Error as e:
+        print(f"Could not set collation locale {COLLATION_LOCALE!r}: {str(e)}. "
+              f"Sorting falls back to the current locale ({locale.setlocale(locale.LC_COLLATE)}).")
+
+
+def collation_key(text):
+    """Locale-aware sort key for a description or supplier code"""
+    return locale.strxfrm((text or '').strip().casefold())
+
+
+def collation_ranks(values):
+    """Return a numpy array with the dense collation rank of each value in a Series
+    (equal keys share a rank)"""
+    keys = [collation_key(v) for v in values.tolist()]
+    ranks = np.empty(len(keys), dtype=np.int64)
+    rank = -1
+    previous = None
+    for i in sorted(range(len(keys)), key=keys.__getitem__):
+        if keys[i] != previous:
+            rank += 1
+            previous = keys[i]
+        ranks[i] = rank
+    return ranks
+
+
+def build_sort_indexes(snapshot):
+    """Precompute the row order of every tab for every sort order in SORT_ORDERS.
+
+    Returns a dictionary mapping tab -> sort -> numpy array of snapshot row positions,
+    so a request only has to look up its permutation instead of sorting. The
+    'snapshot' key orders every row of the snapshot (used by the snapshot exports).
+
+    Each order is sorted once over the whole snapshot; a tab's permutation is that
+    order filtered down to the tab's rows, which keeps the relative order.
+    """
+    configure_collation()
+    description_ranks = collation_ranks(snapshot['Description'])
+    code_ranks = collation_ranks(snapshot['Supplier_Item_Code'])
+    onhand = snapshot['Onhand_Effective'].to_numpy()
+
+    # np.lexsort sorts by the last key first and is stable, so ties keep API order
+    orders = {
+        'description': np.argsort(description_ranks, kind='stable'),
+        '-description': np.argsort(-description_ranks, kind='stable'),
+        'code': np.lexsort((description_ranks, code_ranks)),
+        '-code': np.lexsort((-description_ranks, -code_ranks)),
+        'onhand': np.lexsort((description_ranks, onhand)),
+        '-onhand': np.lexsort((description_ranks, -onhand)),
+    }
+
+    categories = snapshot['Category'].to_numpy(dtype=object)
+    masks = {tab: categories == tab for tab in TABS if tab != 'allproducts'}
+    masks['allproducts'] = snapshot['In_All_Products'].to_numpy(dtype=bool)
+
+    sort_indexes = {'snapshot': orders}
+    for tab, mask in masks.items():
+        sort_indexes[tab] = {sort: order[mask[order]] for sort, order in orders.items()}
+    return sort_indexes
+
+
+def parse_alert_threshold(value, name):
+    """Return a threshold from the config, or None (with a warning) if it isn't a number"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        print(f"Ignoring threshold {name} in {ALERT_CONFIG_FILE}: {value!r} is not a number.")
+        return None
+    return value
+
+
+def validate_alert_config(raw):
+    """Check the types in a loaded thresholds config and drop invalid values.
+    Returns the cleaned config, or None if it isn't a JSON object."""
+    if not isinstance(raw, dict):
+        print(f"Error loading {ALERT_CONFIG_FILE}: expected a JSON object, got {type(raw).__name__}.")
+        return None
+    
+    config = {'default': parse_alert_threshold(raw.get('default'), 'default')}
+    
+    hysteresis = raw.get('hysteresis', 0)
+    if isinstance(hysteresis, bool) or not isinstance(hysteresis, (int, float)) or hysteresis < 0:
+        print(f"Ignoring hysteresis in {ALERT_CONFIG_FILE}: {hysteresis!r} is not a non-negative number.")
+        hysteresis = 0
+    config['hysteresis'] = hysteresis
+    
+    # Supplier codes and categories are matched case-insensitively
+    for key, normalize in (('skus', lambda code: code.strip().upper()), ('categories', lambda tab: tab.strip().lower())):
+        entries = raw.get(key) or {}
+        if not isinstance(entries, dict):
+            print(f"Ignoring {key} in {ALERT_CONFIG_FILE}: expected a JSON object.")
+            entries = {}
+        config[key] = {}
+        for name, value in entries.items():
+            threshold = parse_alert_threshold(value, f'{key}.{name}')
+            if threshold is not None:
+                config[key][normalize(name)] = threshold
+    
+    for key in ('log_file', 'webhook_url'):
+        value = raw.get(key)
+        if value is not None and not isinstance(value, str):
+            print(f"Ignoring {key} in {ALERT_CONFIG_FILE}: expected a string.")
+            value = None
+        config[key] = value or None
+    return config
+
+
+def load_alert_config():
+    """Load the thresholds config, re-reading it only when the file changes.
+    Returns tuple: (config, mtime, changed) where config is None if alerts are disabled.
+    alert_state is not modified; the caller stores config and mtime once it has used them."""
+    try:
+        mtime = os.path.getmtime(ALERT_CONFIG_FILE)
+    except OSError:
+        return None, None, alert_state['config'] is not None
+    
+    if mtime == alert_state['config_mtime']:
+        return alert_state['config'], mtime, False
+    
+    try:
+        with open(ALERT_CONFIG_FILE, encoding='utf-8') as f:
+            config = validate_alert_config(json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"Error loading {ALERT_CONFIG_FILE}: {str(e)}.")
+        config = None
+    
+    if config is None:
+        # Keep the previous thresholds until the file is fixed
+        print("Keeping previous thresholds.")
+        return alert_state['config'], mtime, False
+    return config, mtime, True
+
+
+def get_alert_level(onhand, threshold, hysteresis, previous_level):
+    """Return 'negative', 'low' or None (ok) for an on-hand quantity.
+
+    A SKU becomes low at or below its threshold and only recovers once it is more than
+    `hysteresis` above it, so quantities hovering around the threshold don't flap.
+    Without a threshold only negative quantities alert, with no hysteresis.
+    """
+    if onhand < 0:
+        return 'negative'
+    if threshold is None:
+        return None
+    if onhand <= threshold:
+        return 'low'
+    if previous_level is not None and onhand <= threshold + hysteresis:
+        return 'low'
+    return None
+
+
+def evaluate_stock_alerts(snapshot, timestamp):
+    """Evaluate the reorder thresholds for SKUs whose on-hand changed since the last refresh.
+    Returns a list of alert events for SKUs that changed alert level.
+
+    Kits are evaluated on their calculated on-hand quantity, so a component change that
+    changes a kit's availability also re-evaluates the kit. All SKUs are evaluated when
+    the thresholds config changes. SKUs with a non-numeric on-hand value are skipped.
+    
+    alert_state is only updated once every SKU has been evaluated, so if this raises
+    the next refresh evaluates the same changes again.
+    """
+    config, config_mtime, config_changed = load_alert_config()
+    
+    codes = [code.strip().upper() for code in snapshot['Supplier_Item_Code'].tolist()]
+    previous_onhand = alert_state['onhand']
+    
+    # SKUs whose on-hand isn't a number keep their previous quantity, so they are
+    # skipped rather than evaluated as 0 (which would report a negative SKU as recovered)
+    onhand = {}
+    for code, value, numeric in zip(codes, snapshot['Onhand_Effective'].tolist(), snapshot['Onhand_Numeric'].tolist()):
+        if numeric:
+            onhand[code] = value
+        elif code in previous_onhand:
+            onhand[code] = previous_onhand[code]
+    
+    if config is None:
+        levels = {}
+        changed = set()
+    else:
+        # Forget SKUs that are no longer returned by the API
+        listed = set(codes)
+        levels = {code: level for code, level in alert_state['levels'].items() if code in listed}
+        if config_changed:
+            changed = set(onhand)
+        else:
+            changed = {code for code, value in onhand.items() if previous_onhand.get(code) != value}
+    
+    events = []
+    if changed:
+        events = evaluate_changed_skus(snapshot, codes, onhand, changed, levels, config, timestamp)
+    
+    alert_state['config'] = config
+    alert_state['config_mtime'] = config_mtime
+    alert_state['onhand'] = onhand
+    alert_state['levels'] = levels
+    return events
+
+
+def evaluate_changed_skus(snapshot, codes, onhand, changed, levels, config, timestamp):
+    """Evaluate the thresholds of the changed SKUs, updating `levels` in place.
+    Returns the alert events for SKUs that changed alert level."""
+    rows = {code: i for i, code in enumerate(codes) if code in changed}
+    descriptions = snapshot['Description']
+    categories = snapshot['Category']
+    default_threshold = config['default']
+    hysteresis = config['hysteresis']
+    
+    events = []
+    for code, i in rows.items():
+        category = categories.iat[i]
+        threshold = config['skus'].get(code, config['categories'].get(category, default_threshold))
+        previous_level = levels.get(code)
+        level = get_alert_level(onhand[code], threshold, hysteresis, previous_level)
+        
+        # Only emit when the level changes (deduplicates repeated lows)
+        if level == previous_level:
+            continue
+        if level is None:
+            del levels[code]
+        else:
+            levels[code] = level
+        
+        events.append({
+            'event': f'stock_{level}' if level else 'stock_recovered',
+            'supplier_item_code': snapshot['Supplier_Item_Code'].iat[i],
+            'description': descriptions.iat[i],
+            'category': category,
+            'onhand_available': onhand[code],
+            'threshold': threshold,
+            'previous_level': previous_level,
+            'timestamp': timestamp.isoformat()
+        })
+    return events
+
+
+def emit_stock_alerts(events, config):
+    """Send alert events to the configured sinks: a JSON lines file and/or a webhook"""
+    log_file = config.get('log_file')
+    if log_file:
+        # Relative paths are relative to the thresholds config file
+        log_file = os.path.join(os.path.dirname(ALERT_CONFIG_FILE), log_file)
+        try:
+            with open(log_file, 'a', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event) + '\n')
+        except OSError as e:
+            print(f"Error writing stock alerts to {log_file}: {str(e)}")
+    
+    webhook_url = config.get('webhook_url')
+    if webhook_url:
+        try:
+            response = requests.post(webhook_url, json={'events': events}, timeout=10)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"Error sending stock alerts to webhook: {str(e)}")
+
+
+def send_stock_alerts_periodically():
+    """Background thread function that sends queued alert batches one at a time, in order"""
+    while True:
+        events, config = alert_state['queue'].get()
+        try:
+            emit_stock_alerts(events, config)
+        except Exception as e:
+            print(f"Error sending stock alerts: {str(e)}")
+
+
+def queue_stock_alerts(events, config):
+    """Queue alert events for the sender thread, starting it on first use"""
+    if alert_state['sender'] is None:
+        alert_state['sender'] = threading.Thread(target=send_stock_alerts_periodically, daemon=True)
+        alert_state['sender'].start()
+    alert_state['queue'].put((events, config))
+
+
+def store_stock_data(result, timestamp):
+    """Rebuild the snapshot, display records and sort indexes for freshly fetched products,
+    swap them into the cache and evaluate stock alerts. Must be called with cache['refresh_lock']
+    held; cache['lock'] is only taken to swap the new data in, so pages aren't blocked by the rebuild."""
+    snapshot = build_stock_snapshot(result)
+    records = build_snapshot_records(result, snapshot)
+    sort_indexes = build_sort_indexes(snapshot)
+    with cache['lock']:
+        cache['data'] = result
+        cache['timestamp'] = timestamp
+        cache['snapshot'] = snapshot
+        cache['records'] = records
+        cache['sort_indexes'] = sort_indexes
+    
+    # Evaluate low-stock thresholds and emit alerts without holding up the refresh.
+    # A failure here must not break the refresh or the page that triggered it.
+    try:
+        events = evaluate_stock_alerts(snapshot, timestamp)
+    except Exception as e:
+        print(f"Error evaluating stock alerts: {str(e)}. Alert state left unchanged.")
+        events = []
+    if events:
+        print(f"{len(events)} stock alert(s) at {timestamp}")
+        queue_stock_alerts(events, alert_state['config'])
+
+
+def get_sorted_tabs(tabs, sort):
+    """Return a dictionary mapping each tab to its products in the requested sort order.
+    All tabs are read from the same snapshot, even if the cache refreshes meanwhile.
+
+    Args:
+        tabs: Keys of TABS
+        sort: A key of SORT_ORDERS (unknown orders fall back to DEFAULT_SORT)
+    """
+    if sort not in SORT_ORDERS:
+        sort = DEFAULT_SORT
+    with cache['lock']:
+        records = cache['records']
+        sort_indexes = cache['sort_indexes']
+    if records is None:
+        return {tab: [] for tab in tabs}
+    return {tab: [records[i] for i in sort_indexes[tab][sort].tolist()] for tab in tabs}
+
+
+def get_sorted_products(tab, sort):
+    """Return the products of a tab in the requested sort order.
+
+    Args:
+        tab: A key of TABS (unknown tabs fall back to 'allproducts')
+        sort: A key of SORT_ORDERS (unknown orders fall back to DEFAULT_SORT)
+    """
+    if tab not in TABS:
+        tab = 'allproducts'
+    return get_sorted_tabs([tab], sort)[tab]
+
+
 def get_cached_stock_data():
     """Get stock data from cache or fetch new data if cache is stale/missing.
     Returns tuple: (data, timestamp, is_cached, api_error) where:
     - is_cached indicates if cached data was used
     - api_error indicates if we're using cached data due to an API error"""
     with cache['lock']:
-        now = datetime.now(UTC_PLUS_2)
-        
         # Check if cache is valid
         if cache['data'] is not None and cache['timestamp'] is not None:
-            if now - cache['timestamp'] < CACHE_DURATION:
+            if datetime.now(UTC_PLUS_2) - cache['timestamp'] < CACHE_DURATION:
                 # Cache is still valid, return it (no API error)
                 return cache['data'], cache['timestamp'], True, False
+    
+    with cache['refresh_lock']:
+        now = datetime.now(UTC_PLUS_2)
+        
+        # Another request may have refreshed the cache while we waited
+        with cache['lock']:
+            if cache['data'] is not None and cache['timestamp'] is not None:
+                if now - cache['timestamp'] < CACHE_DURATION:
+                    return cache['data'], cache['timestamp'], True, False
         
         # Cache is stale or missing, try to fetch new data
         result = fetch_stock_data()
@@ -288,15 +825,14 @@ def get_cached_stock_data():
         # Check if API call failed (result is a dict with 'error' key)
         if isinstance(result, dict) and 'error' in result:
             # API call failed, return cached data if available
-            if cache['data'] is not None and cache['timestamp'] is not None:
-                return cache['data'], cache['timestamp'], True, True
-            else:
-                # No cached data available, return error
-                return result, None, False, True
+            with cache['lock']:
+                if cache['data'] is not None and cache['timestamp'] is not None:
+                    return cache['data'], cache['timestamp'], True, True
+            # No cached data available, return error
+            return result, None, False, True
         
         # API call succeeded, update cache
-        cache['data'] = result
-        cache['timestamp'] = now
+        store_stock_data(result, now)
         
         return result, now, False, False
 
@@ -307,12 +843,11 @@ def update_cache_periodically():
         try:
             time.sleep(CACHE_DURATION.total_seconds())
             # Fetch new data and update cache only if successful
-            with cache['lock']:
+            with cache['refresh_lock']:
                 result = fetch_stock_data()
                 # Only update cache if API call succeeded (not an error)
                 if not (isinstance(result, dict) and 'error' in result):
-                    cache['data'] = result
-                    cache['timestamp'] = datetime.now(UTC_PLUS_2)
+                    store_stock_data(result, datetime.now(UTC_PLUS_2))
                     print(f"Cache updated at {cache['timestamp']}")
                 else:
                     print(f"Cache update failed: {result.get('error', 'Unknown error')}. Keeping existing cache.")
@@ -344,213 +879,112 @@ def format_onhand_display(onhand_value, is_staff=False):
             return '<span class="out-of-stock">Out Of Stock</span>'
 
 
-@app.route('/')
-def index():
-    """Main page - fetch and display stock data"""
+def build_virtual_rows(products, is_staff):
+    """Build the compact All Products payload for the virtualised table.
+
+    Each row is [description, supplier code, display on-hand, sortable on-hand].
+    The display value is None where the public view shows "Out Of Stock", and the
+    public view never receives negative quantities.
+    """
+    rows = []
+    for product in products:
+        onhand_value = product.get('Onhand_Available')
+        onhand = parse_onhand(onhand_value)
+        if is_staff:
+            display = str(onhand_value) if onhand_value else '-'
+        else:
+            onhand = max(onhand, 0)
+            display = str(onhand) if onhand > 0 else None
+        rows.append([product.get('Description') or '-', product.get('Supplier_Item_Code') or '-', display, onhand])
+    return rows
+
+
+def render_stock_page(is_staff):
+    """Render the stock page for the public or staff view.
+
+    The sort order comes from the ?sort= query parameter (see SORT_ORDERS) and is
+    looked up in the precomputed sort indexes rather than sorted per request.
+    With ?view=virtual the All Products tab is sent as JSON and drawn client-side.
+    """
+    sort = request.args.get('sort', DEFAULT_SORT)
+    if sort not in SORT_ORDERS:
+        sort = DEFAULT_SORT
+    # ?view=virtual draws the All Products tab client-side from a JSON payload
+    virtual_all_products = request.args.get('view') == 'virtual'
+    
     result, cache_timestamp, is_cached, api_error = get_cached_stock_data()
     
     # If there's an error and no cached data, return it
     if isinstance(result, dict) and 'error' in result:
-        return render_template('index.html', error=result['error'], japi_products=[], dropin_products=[], driptrays_products=[], water_features_products=[], nb_fx_products=[], all_products=[], cache_timestamp=None, is_cached=False, api_error=False)
-    
-    # Convert to list if needed
-    if not isinstance(result, list):
-        result = []
-    
-    # Separate products into categories:
-    # 1. Water Features (Supplier_Item_Code starts with "W")
-    # 2. Organic Feature Pots (Supplier_Item_Code starts with "NBP", "FX", "NR", or "RV", or Description contains "Organic Fiberglass")
-    # 3. Driptrays (Supplier_Item_Code contains "JPRD" or "JPQD")
-    # 4. Drop-in Pots (Description contains "Styler" or "Shrub")
-    # 5. Japi Planters (Supplier_Item_Code starts with "J" or "NSGB2")
-    # 6. Plastic Woven Mats (Supplier_Item_Code starts with "PWM")
-    # 7. All Products (all products from API - for separate tab)
-    water_features_products = []
-    nb_fx_products = []
-    driptrays_products = []
-    dropin_products = []
-    japi_products = []
-    plasticmats_products = []
-    
-    for product in result:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        # Skip products without a supplier item code
-        if not supplier_code:
-            continue
-        description = (product.get('Description') or '').strip().upper()
-        
-        # Priority 1: Water Features (Supplier_Item_Code starts with "W")
-        if supplier_code.startswith('W'):
-            water_features_products.append(product)
-        # Priority 2: Organic Feature Pots (Supplier_Item_Code starts with "NBP", "FX", "NR", or "RV", or Description contains "Organic Fiberglass")
-        elif supplier_code.startswith('NBP') or supplier_code.startswith('FX') or supplier_code.startswith('NR') or supplier_code.startswith('RV') or 'ORGANIC FIBERGLASS' in description:
-            nb_fx_products.append(product)
-        # Priority 3: Driptrays (Supplier_Item_Code contains "JPRD" or "JPQD")
-        elif 'JPRD' in supplier_code or 'JPQD' in supplier_code:
-            driptrays_products.append(product)
-        # Priority 4: Drop-in Pots (Description contains "Styler" or "Shrub")
-        elif 'STYLER' in description or 'SHRUB' in description:
-            dropin_products.append(product)
-        # Priority 5: Japi Planters (Supplier_Item_Code starts with "J" or "NSGB2")
-        elif supplier_code.startswith('J') or supplier_code.startswith('NSGB2'):
-            japi_products.append(product)
-        # Priority 6: Plastic Woven Mats (Supplier_Item_Code starts with "PWM")
-        elif supplier_code.startswith('PWM'):
-            plasticmats_products.append(product)
-    
-    # Create a dictionary mapping supplier codes to on-hand quantities for water feature calculations
-    products_dict = {}
-    for product in result:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        if supplier_code:
-            products_dict[supplier_code] = product.get('Onhand_Available', '0')
-    
-    # Calculate on-hand quantities for water features
-    for product in water_features_products:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        calculated_onhand = calculate_water_feature_onhand(supplier_code, products_dict)
-        product['Onhand_Available'] = str(calculated_onhand)
-    
-    # Sort all lists alphabetically by Description
-    japi_products = sorted(japi_products, key=lambda x: (x.get('Description') or '').lower())
-    dropin_products = sorted(dropin_products, key=lambda x: (x.get('Description') or '').lower())
-    driptrays_products = sorted(driptrays_products, key=lambda x: (x.get('Description') or '').lower())
-    water_features_products = sorted(water_features_products, key=lambda x: (x.get('Description') or '').lower())
-    nb_fx_products = sorted(nb_fx_products, key=lambda x: (x.get('Description') or '').lower())
-    plasticmats_products = sorted(plasticmats_products, key=lambda x: (x.get('Description') or '').lower())
-    
-    # Filter all_products to exclude products with certain words in description
-    excluded_words = ['Delivery', 'Voluto', 'Nativa', 'Miscellaneous']
-    all_products_filtered = []
-    for product in result:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip()
-        # Skip products without a supplier item code
-        if not supplier_code:
-            continue
-        description = (product.get('Description') or '').strip()
-        # Check if description contains any excluded words (case-insensitive)
-        if not any(word.lower() in description.lower() for word in excluded_words):
-            all_products_filtered.append(product)
+        return render_template('index.html', error=result['error'], japi_products=[], dropin_products=[], driptrays_products=[], water_features_products=[], nb_fx_products=[], all_products=[], cache_timestamp=None, is_cached=False, api_error=False, is_staff=is_staff, sort=sort, sort_orders=SORT_ORDERS)
     
-    # Calculate on-hand quantities for water features in all_products
-    for product in all_products_filtered:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        if supplier_code.startswith('W'):
-            calculated_onhand = calculate_water_feature_onhand(supplier_code, products_dict)
-            product['Onhand_Available'] = str(calculated_onhand)
+    # Categories (see get_product_category), each in the requested order:
+    # 1. Water Features, 2. Organic Feature Pots, 3. Driptrays, 4. Drop-in Pots,
+    # 5. Japi Planters, 6. Plastic Woven Mats, 7. All Products (excluding EXCLUDED_WORDS)
+    products = get_sorted_tabs(TABS, sort)
     
-    all_products = sorted(all_products_filtered, key=lambda x: (x.get('Description') or '').lower())
+    all_products_rows = build_virtual_rows(products['allproducts'], is_staff) if virtual_all_products else None
     
-    return render_template('index.html', error=None, japi_products=japi_products, dropin_products=dropin_products, driptrays_products=driptrays_products, water_features_products=water_features_products, nb_fx_products=nb_fx_products, plasticmats_products=plasticmats_products, all_products=all_products, cache_timestamp=cache_timestamp, is_cached=is_cached, api_error=api_error, is_staff=False)
+    return render_template('index.html', error=None, japi_products=products['japi'], dropin_products=products['dropin'], driptrays_products=products['driptrays'], water_features_products=products['waterfeatures'], nb_fx_products=products['nbfx'], plasticmats_products=products['plasticmats'], all_products=products['allproducts'], cache_timestamp=cache_timestamp, is_cached=is_cached, api_error=api_error, is_staff=is_staff, sort=sort, sort_orders=SORT_ORDERS, virtual_all_products=virtual_all_products, all_products_rows=all_products_rows)
+
+
+@app.route('/')
+def index():
+    """Main page - fetch and display stock data"""
+    return render_stock_page(is_staff=False)
 
 
 @app.route('/staff')
 def staff():
     """Staff page - same as main page but shows actual values including negatives"""
-    result, cache_timestamp, is_cached, api_error = get_cached_stock_data()
-    
-    # If there's an error and no cached data, return it
-    if isinstance(result, dict) and 'error' in result:
-        return render_template('index.html', error=result['error'], japi_products=[], dropin_products=[], driptrays_products=[], water_features_products=[], nb_fx_products=[], all_products=[], cache_timestamp=None, is_cached=False, api_error=False, is_staff=True)
-    
-    # Convert to list if needed
-    if not isinstance(result, list):
-        result = []
-    
-    # Separate products into categories:
-    # 1. Water Features (Supplier_Item_Code starts with "W")
-    # 2. Organic Feature Pots (Supplier_Item_Code starts with "NBP", "FX", "NR", or "RV", or Description contains "Organic Fiberglass")
-    # 3. Driptrays (Supplier_Item_Code contains "JPRD" or "JPQD")
-    # 4. Drop-in Pots (Description contains "Styler" or "Shrub")
-    # 5. Japi Planters (Supplier_Item_Code starts with "J" or "NSGB2")
-    # 6. Plastic Woven Mats (Supplier_Item_Code starts with "PWM")
-    # 7. All Products (all products from API - for separate tab)
-    water_features_products = []
-    nb_fx_products = []
-    driptrays_products = []
-    dropin_products = []
-    japi_products = []
-    plasticmats_products = []
-    
-    for product in result:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        # Skip products without a supplier item code
-        if not supplier_code:
-            continue
-        description = (product.get('Description') or '').strip().upper()
-        
-        # Priority 1: Water Features (Supplier_Item_Code starts with "W")
-        if supplier_code.startswith('W'):
-            water_features_products.append(product)
-        # Priority 2: Organic Feature Pots (Supplier_Item_Code starts with "NBP", "FX", "NR", or "RV", or Description contains "Organic Fiberglass")
-        elif supplier_code.startswith('NBP') or supplier_code.startswith('FX') or supplier_code.startswith('NR') or supplier_code.startswith('RV') or 'ORGANIC FIBERGLASS' in description:
-            nb_fx_products.append(product)
-        # Priority 3: Driptrays (Supplier_Item_Code contains "JPRD" or "JPQD")
-        elif 'JPRD' in supplier_code or 'JPQD' in supplier_code:
-            driptrays_products.append(product)
-        # Priority 4: Drop-in Pots (Description contains "Styler" or "Shrub")
-        elif 'STYLER' in description or 'SHRUB' in description:
-            dropin_products.append(product)
-        # Priority 5: Japi Planters (Supplier_Item_Code starts with "J" or "NSGB2")
-        elif supplier_code.startswith('J') or supplier_code.startswith('NSGB2'):
-            japi_products.append(product)
-        # Priority 6: Plastic Woven Mats (Supplier_Item_Code starts with "PWM")
-        elif supplier_code.startswith('PWM'):
-            plasticmats_products.append(product)
-    
-    # Create a dictionary mapping supplier codes to on-hand quantities for water feature calculations
-    products_dict = {}
-    for product in result:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        if supplier_code:
-            products_dict[supplier_code] = product.get('Onhand_Available', '0')
-    
-    # Calculate on-hand quantities for water features
-    for product in water_features_products:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        calculated_onhand = calculate_water_feature_onhand(supplier_code, products_dict)
-        product['Onhand_Available'] = str(calculated_onhand)
-    
-    # Sort all lists alphabetically by Description
-    japi_products = sorted(japi_products, key=lambda x: (x.get('Description') or '').lower())
-    dropin_products = sorted(dropin_products, key=lambda x: (x.get('Description') or '').lower())
-    driptrays_products = sorted(driptrays_products, key=lambda x: (x.get('Description') or '').lower())
-    water_features_products = sorted(water_features_products, key=lambda x: (x.get('Description') or '').lower())
-    nb_fx_products = sorted(nb_fx_products, key=lambda x: (x.get('Description') or '').lower())
-    plasticmats_products = sorted(plasticmats_products, key=lambda x: (x.get('Description') or '').lower())
-    
-    # Filter all_products to exclude products with certain words in description
-    excluded_words = ['Delivery', 'Voluto', 'Nativa', 'Miscellaneous']
-    all_products_filtered = []
-    for product in result:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip()
-        # Skip products without a supplier item code
-        if not supplier_code:
-            continue
-        description = (product.get('Description') or '').strip()
-        # Check if description contains any excluded words (case-insensitive)
-        if not any(word.lower() in description.lower() for word in excluded_words):
-            all_products_filtered.append(product)
-    
-    # Calculate on-hand quantities for water features in all_products
-    for product in all_products_filtered:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        if supplier_code.startswith('W'):
-            calculated_onhand = calculate_water_feature_onhand(supplier_code, products_dict)
-            product['Onhand_Available'] = str(calculated_onhand)
-    
-    all_products = sorted(all_products_filtered, key=lambda x: (x.get('Description') or '').lower())
-    
-    return render_template('index.html', error=None, japi_products=japi_products, dropin_products=dropin_products, driptrays_products=driptrays_products, water_features_products=water_features_products, nb_fx_products=nb_fx_products, plasticmats_products=plasticmats_products, all_products=all_products, cache_timestamp=cache_timestamp, is_cached=is_cached, api_error=api_error, is_staff=True)
+    return render_stock_page(is_staff=True)
+
+
+def export_snapshot(snapshot, export_format):
+    """Export the full stock snapshot as Parquet, Arrow IPC or gzip CSV.
+
+    Args:
+        snapshot: DataFrame from build_stock_snapshot
+        export_format: One of the keys of SNAPSHOT_EXPORT_FORMATS
+    """
+    output = BytesIO()
+    if export_format == 'parquet':
+        snapshot.to_parquet(output, index=False, engine='pyarrow')
+    elif export_format == 'arrow':
+        import pyarrow as pa
+        table = pa.Table.from_pandas(snapshot, preserve_index=False)
+        with pa.ipc.new_file(output, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        snapshot.to_csv(output, index=False, compression={'method': 'gzip'})
+
+    output.seek(0)
+
+    # Generate filename with timestamp
+    extension, mimetype = SNAPSHOT_EXPORT_FORMATS[export_format]
+    timestamp = datetime.now(UTC_PLUS_2).strftime('%Y%m%d_%H%M%S')
+    filename = f'stock_snapshot_{timestamp}.{extension}'
+
+    return send_file(
+        output,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=filename
+    )
 
 
 @app.route('/export')
 def export_excel():
     """Export stock data to Excel file - exports products from the specified tab"""
-    from flask import request
-    
-    # Get the tab parameter from query string
+    # Get the tab and sort parameters from query string
     tab = request.args.get('tab', 'allproducts')
+    if tab not in TABS:
+        # Default to all products if tab is unknown
+        tab = 'allproducts'
+    sort = request.args.get('sort', DEFAULT_SORT)
+    export_format = request.args.get('format', 'xlsx').lower()
+    if export_format != 'xlsx' and export_format not in SNAPSHOT_EXPORT_FORMATS:
+        return f"Error: Unknown export format. Use xlsx, {', '.join(SNAPSHOT_EXPORT_FORMATS)}.", 400
     
     # Fetch all stock data from cache
     result, cache_timestamp, is_cached, _ = get_cached_stock_data()
@@ -562,125 +996,18 @@ def export_excel():
     if not isinstance(result, list):
         result = []
     
-    # Create a dictionary mapping supplier codes to on-hand quantities for water feature calculations
-    products_dict = {}
-    for product in result:
-        supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-        if supplier_code:
-            products_dict[supplier_code] = product.get('Onhand_Available', '0')
+    # Columnar formats export the full snapshot (all tabs, with category and kit columns)
+    if export_format in SNAPSHOT_EXPORT_FORMATS:
+        if sort not in SORT_ORDERS:
+            sort = DEFAULT_SORT
+        with cache['lock']:
+            snapshot = cache['snapshot']
+            sort_indexes = cache['sort_indexes']
+        return export_snapshot(snapshot.iloc[sort_indexes['snapshot'][sort]], export_format)
     
-    # Filter products based on the tab (same logic as index route)
-    if tab == 'allproducts':
-        # Export all products (excluding products with certain words in description)
-        excluded_words = ['Delivery', 'Voluto', 'Nativa', 'Miscellaneous']
-        products = []
-        for product in result:
-            supplier_code = (product.get('Supplier_Item_Code') or '').strip()
-            # Skip products without a supplier item code
-            if not supplier_code:
-                continue
-            description = (product.get('Description') or '').strip()
-            # Check if description contains any excluded words (case-insensitive)
-            if not any(word.lower() in description.lower() for word in excluded_words):
-                products.append(product)
-        # Calculate on-hand quantities for water features in all_products
-        for product in products:
-            supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-            if supplier_code.startswith('W'):
-                calculated_onhand = calculate_water_feature_onhand(supplier_code, products_dict)
-                product['Onhand_Available'] = str(calculated_onhand)
-        sheet_name = 'All Products'
-        filename_prefix = 'all_products'
-    else:
-        # Separate products into categories (same logic as index route)
-        water_features_products = []
-        nb_fx_products = []
-        driptrays_products = []
-        dropin_products = []
-        japi_products = []
-        plasticmats_products = []
-        
-        for product in result:
-            supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-            # Skip products without a supplier item code
-            if not supplier_code:
-                continue
-            description = (product.get('Description') or '').strip().upper()
-            
-            # Priority 1: Water Features (Supplier_Item_Code starts with "W")
-            if supplier_code.startswith('W'):
-                water_features_products.append(product)
-            # Priority 2: Organic Feature Pots (Supplier_Item_Code starts with "NBP", "FX", "NR", or "RV", or Description contains "Organic Fiberglass")
-            elif supplier_code.startswith('NBP') or supplier_code.startswith('FX') or supplier_code.startswith('NR') or supplier_code.startswith('RV') or 'ORGANIC FIBERGLASS' in description:
-                nb_fx_products.append(product)
-            # Priority 3: Driptrays (Supplier_Item_Code contains "JPRD" or "JPQD")
-            elif 'JPRD' in supplier_code or 'JPQD' in supplier_code:
-                driptrays_products.append(product)
-            # Priority 4: Drop-in Pots (Description contains "Styler" or "Shrub")
-            elif 'STYLER' in description or 'SHRUB' in description:
-                dropin_products.append(product)
-            # Priority 5: Japi Planters (Supplier_Item_Code starts with "J" or "NSGB2")
-            elif supplier_code.startswith('J') or supplier_code.startswith('NSGB2'):
-                japi_products.append(product)
-            # Priority 6: Plastic Woven Mats (Supplier_Item_Code starts with "PWM")
-            elif supplier_code.startswith('PWM'):
-                plasticmats_products.append(product)
-        
-        # Calculate on-hand quantities for water features
-        for product in water_features_products:
-            supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-            calculated_onhand = calculate_water_feature_onhand(supplier_code, products_dict)
-            product['Onhand_Available'] = str(calculated_onhand)
-        
-        # Get products for the requested tab
-        if tab == 'japi':
-            products = japi_products
-            sheet_name = 'Japi Planters'
-            filename_prefix = 'japi_planters'
-        elif tab == 'driptrays':
-            products = driptrays_products
-            sheet_name = 'Driptrays'
-            filename_prefix = 'driptrays'
-        elif tab == 'dropin':
-            products = dropin_products
-            sheet_name = 'Drop-in Pots'
-            filename_prefix = 'dropin_pots'
-        elif tab == 'waterfeatures':
-            products = water_features_products
-            sheet_name = 'Water Features'
-            filename_prefix = 'water_features'
-        elif tab == 'nbfx':
-            products = nb_fx_products
-            sheet_name = 'Organic Feature Pots'
-            filename_prefix = 'organic_feature_pots'
-        elif tab == 'plasticmats':
-            products = plasticmats_products
-            sheet_name = 'Plastic Woven Mats'
-            filename_prefix = 'plastic_woven_mats'
-        else:
-            # Default to all products if tab is unknown (excluding products with certain words in description)
-            excluded_words = ['Delivery', 'Voluto', 'Nativa', 'Miscellaneous']
-            products = []
-            for product in result:
-                supplier_code = (product.get('Supplier_Item_Code') or '').strip()
-                # Skip products without a supplier item code
-                if not supplier_code:
-                    continue
-                description = (product.get('Description') or '').strip()
-                # Check if description contains any excluded words (case-insensitive)
-                if not any(word.lower() in description.lower() for word in excluded_words):
-                    products.append(product)
-            # Calculate on-hand quantities for water features
-            for product in products:
-                supplier_code = (product.get('Supplier_Item_Code') or '').strip().upper()
-                if supplier_code.startswith('W'):
-                    calculated_onhand = calculate_water_feature_onhand(supplier_code, products_dict)
-                    product['Onhand_Available'] = str(calculated_onhand)
-            sheet_name = 'All Products'
-            filename_prefix = 'all_products'
-    
-    # Sort products alphabetically by Description
-    products = sorted(products, key=lambda x: (x.get('Description') or '').lower())
+    # Get products for the requested tab, in the requested order
+    products = get_sorted_products(tab, sort)
+    sheet_name, filename_prefix = TABS[tab]
     
     # Create DataFrame
     df = pd.DataFrame(products)
@@ -716,14 +1043,20 @@ def export_excel():
 
 
 if __name__ == '__main__':
-    # Initialize cache on startup
-    print("Initializing cache...")
-    get_cached_stock_data()
+    debug = True
     
-    # Start background thread to update cache periodically
-    cache_thread = threading.Thread(target=update_cache_periodically, daemon=True)
-    cache_thread.start()
-    print("Cache update thread started. Cache will refresh every 5 minutes.")
+    # With debug on, the Werkzeug reloader runs this block in a watcher process and in the
+    # serving process (WERKZEUG_RUN_MAIN=true). Only the serving process refreshes the cache,
+    # so stock alerts are evaluated and sent once.
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Initialize cache on startup
+        print("Initializing cache...")
+        get_cached_stock_data()
+        
+        # Start background thread to update cache periodically
+        cache_thread = threading.Thread(target=update_cache_periodically, daemon=True)
+        cache_thread.start()
+        print("Cache update thread started. Cache will refresh every 5 minutes.")
     
-    app.run(debug=True, host='127.0.0.1', port=6200)
+    app.run(debug=debug, host='127.0.0.1', port=6200)
 